@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.indexing.shard_index import build_shards
+from src.indexing.shard_search import ShardedSearcher
+
+TOP_K = 10
+ROUNDS = 20
+
+QUERIES = [
+    "history of modern art",
+    "quantum mechanics and the atom",
+    "economic growth and inflation",
+    "human brain and behaviour",
+    "classical music composers",
+    "climate change and the environment",
+    "computer algorithms and data structures",
+    "ancient greek philosophy",
+]
+
+
+def measure_throughput(searcher):
+    # Warm up so every worker has finished loading its shard
+    searcher.search_bm25(QUERIES[0], top_k=TOP_K)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for query in QUERIES:
+            searcher.search_bm25(query, top_k=TOP_K)
+    elapsed = time.perf_counter() - start
+    return ROUNDS * len(QUERIES) / elapsed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark sharded BM25 search throughput.")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8], help="Shard counts to test")
+    args = parser.parse_args()
+
+    # Equivalence with the single index is covered by tests/test_shards.py;
+    # benchmark shards go to a temp dir so nothing is left in data/.
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench_shards_") as bench_dir:
+        for n in args.shards:
+            out = os.path.join(bench_dir, f"shards_{n}")
+            build_shards(num_shards=n, shards_dir=out)
+
+            with ShardedSearcher(out) as searcher:
+                qps = measure_throughput(searcher)
+
+            rows.append((n, qps))
+
+    print(f"\nCPU cores: {os.cpu_count()}")
+    print(f"{'shards':>6}  {'queries/s':>10}")
+    for n, qps in rows:
+        print(f"{n:>6}  {qps:>10.1f}")
\ No newline at end of file
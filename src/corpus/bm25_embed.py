@@ -1,8 +1,15 @@
 import os
+import sys
 import json
 import re
 from rank_bm25 import BM25Okapi
 
+# Keep `python src/corpus/<script>.py` working alongside `python -m src.corpus.<script>`
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.indexing.doc_store import DOC_STORE_DIR, DocStore, build_doc_store
+
 CHUNKS_DIR = "data/chunks"
 BM25_INDEX_PATH = "data/bm25_index.json"
 
@@ -57,12 +64,11 @@ def build_bm25_index():
     documents, metadata_list = load_chunks()
 
     tokenized_docs = [tokenize(doc) for doc in documents]
-    bm25 = BM25Okapi(tokenized_docs)
 
+    # Text and metadata go to the doc store; the index keeps only what
+    # scoring needs, keyed by doc id (= position in tokenized_docs).
     index_data = {
-        "documents": documents,
-        "tokenized_docs": tokenized_docs,
-        "metadata": metadata_list
+        "tokenized_docs": tokenized_docs
     }
 
     os.makedirs(os.path.dirname(BM25_INDEX_PATH), exist_ok=True)
@@ -71,6 +77,8 @@ def build_bm25_index():
 
     print(f"BM25 index saved to {BM25_INDEX_PATH}")
 
+    build_doc_store(metadata_list, DOC_STORE_DIR)
+
 
 # ---------------------------------------------------------
 # Load BM25 index from disk
@@ -82,35 +90,35 @@ def load_bm25_index():
     with open(BM25_INDEX_PATH, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    bm25 = BM25Okapi(data["tokenized_docs"])
-    return bm25, data["metadata"]
+    return BM25Okapi(data["tokenized_docs"])
 
 
 # ---------------------------------------------------------
-# Search API
+# Retrieval API (doc ids + scores only)
 # ---------------------------------------------------------
-def search_bm25(query: str, top_k: int = 5):
-    bm25, metadata_list = load_bm25_index()
+def retrieve_bm25(query: str, top_k: int = 5):
+    bm25 = load_bm25_index()
 
     query_tokens = tokenize(query)
     scores = bm25.get_scores(query_tokens)
 
     ranked = sorted(
-        zip(scores, metadata_list),
-        key=lambda x: x[0],
+        range(len(scores)),
+        key=lambda i: scores[i],
         reverse=True
     )[:top_k]
 
-    results = []
-    for score, meta in ranked:
-        results.append({
-            "score": float(score),
-            "chunk_uid": meta["chunk_uid"],
-            "text": meta["text"],
-            "metadata": meta["metadata"]
-        })
+    return [{"doc_id": i, "score": float(scores[i])} for i in ranked]
+
+
+# ---------------------------------------------------------
+# Search API (text + metadata loaded lazily for the top-k)
+# ---------------------------------------------------------
+def search_bm25(query: str, top_k: int = 5):
+    hits = retrieve_bm25(query, top_k=top_k)
 
-    return results
+    with DocStore(DOC_STORE_DIR) as store:
+        return store.hydrate(hits)
 
 
 # ---------------------------------------------------------
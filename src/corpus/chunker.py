@@ -1,8 +1,15 @@
 import os
+import sys
 import re
 import json
 import urllib.request
 
+# Keep `python src/corpus/<script>.py` working alongside `python -m src.corpus.<script>`
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.corpus.clean_text import INPUT_DIR as FETCHED_TEXT_DIR, load_changed_pageids, mark_pageids_processed
+
 INPUT_DIR = "data/cleaned_text_final"
 OUTPUT_DIR = "data/chunks"
 ##TITLE_DIR = "data/titles"   # store <pageid>.title.json from fetch step
@@ -114,6 +121,17 @@ def load_title(pageid: str):
 
     return "Unknown Title"
 
+# ---------------------------------------------------------
+# Remove previous chunks of a page before re-chunking it
+# (a new revision may produce fewer chunks than the old one)
+# ---------------------------------------------------------
+def remove_stale_chunks(pageid: str):
+    prefix = f"{pageid}_chunk_"
+    for filename in os.listdir(OUTPUT_DIR):
+        if filename.startswith(prefix):
+            os.remove(os.path.join(OUTPUT_DIR, filename))
+
+
 # ---------------------------------------------------------
 # Process a single file
 # ---------------------------------------------------------
@@ -135,6 +153,7 @@ def chunk_file(input_path: str, filename: str):
     chunks = create_chunks(sentences)
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    remove_stale_chunks(pageid)
 
     for idx, chunk in enumerate(chunks):
         chunk_uid = f"{pageid}_chunk_{idx}"
@@ -171,23 +190,63 @@ def chunk_file(input_path: str, filename: str):
 # ---------------------------------------------------------
 # Process all files in INPUT_DIR
 # ---------------------------------------------------------
-def chunk_all_files():
+def chunk_all_files(pageids=None):
     if not os.path.exists(INPUT_DIR):
         raise FileNotFoundError(f"Input directory not found: {INPUT_DIR}")
 
     files = [f for f in os.listdir(INPUT_DIR) if f.endswith(".txt")]
+    if pageids is not None:
+        files = [f for f in files if extract_pageid_from_filename(f) in pageids]
     print(f"Found {len(files)} cleaned files to chunk.")
 
+    chunked = []
     for i, filename in enumerate(files, start=1):
         print(f"[{i}/{len(files)}] Chunking {filename}")
         input_path = os.path.join(INPUT_DIR, filename)
         chunk_file(input_path, filename)
+        chunked.append(extract_pageid_from_filename(filename))
 
     print("\nAll files chunked successfully.")
+    return chunked
+
+
+# ---------------------------------------------------------
+# Re-chunk only pages pending from fetch_wikipedia.py
+# A page leaves the pending list only once it has actually been
+# chunked from a cleaned file at least as new as its fetched text;
+# otherwise it stays pending for the next run.
+# ---------------------------------------------------------
+def chunk_changed_files():
+    ready = set()
+    for pageid in sorted(load_changed_pageids()):
+        cleaned_path = os.path.join(INPUT_DIR, f"{pageid}.txt")
+        fetched_path = os.path.join(FETCHED_TEXT_DIR, f"{pageid}.txt")
+
+        if not os.path.exists(cleaned_path):
+            print(f"Warning: pageid={pageid} is pending but {cleaned_path} does not exist; "
+                  f"run clean_text.py --all --changed-only first")
+        elif os.path.exists(fetched_path) and os.path.getmtime(fetched_path) > os.path.getmtime(cleaned_path):
+            print(f"Warning: pageid={pageid} is pending but {cleaned_path} is older than {fetched_path}; "
+                  f"run clean_text.py --all --changed-only first")
+        else:
+            ready.add(pageid)
+
+    chunked = chunk_all_files(pageids=ready) if ready else []
+    mark_pageids_processed(chunked)
+    return chunked
 
 
 # ---------------------------------------------------------
 # CLI entry point
 # ---------------------------------------------------------
 if __name__ == "__main__":
-    chunk_all_files()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Split cleaned pages into sentence-window chunks.")
+    parser.add_argument("--changed-only", action="store_true", help="Only re-chunk pages changed by the last fetch")
+    args = parser.parse_args()
+
+    if args.changed_only:
+        chunk_changed_files()
+    else:
+        chunk_all_files()
\ No newline at end of file
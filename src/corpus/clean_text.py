@@ -1,8 +1,13 @@
 import os
 import re
+import json
 import unicodedata
 from bs4 import BeautifulSoup
 
+INPUT_DIR = "data/cleaned_text"
+OUTPUT_DIR = "data/cleaned_text_final"
+CHANGED_PAGES_PATH = "data/changed_pages.json"
+
 def strip_html(text: str) -> str:
     """Remove HTML tags, scripts, and styles."""
     soup = BeautifulSoup(text, "html.parser")
@@ -59,15 +64,66 @@ def clean_file(input_path: str, output_path: str, lowercase: bool = False) -> st
 
     return output_path
 
+def load_changed_pageids(path: str = CHANGED_PAGES_PATH) -> set:
+    """Pageids downloaded by fetch_wikipedia.py that have not been re-chunked yet."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Changed pages list not found: {path}. Run fetch_wikipedia.py first.")
+
+    with open(path, "r", encoding="utf-8") as f:
+        return set(str(p) for p in json.load(f))
+
+def mark_pageids_processed(pageids, path: str = CHANGED_PAGES_PATH) -> None:
+    """Remove pageids from the pending list once the last per-page stage (chunker) has run."""
+    remaining = sorted(load_changed_pageids(path) - set(pageids))
+    # Same tmp-file + os.replace write as fetch_wikipedia.save_json: this
+    # file is the only record of pages that still need processing.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(remaining, f, indent=2)
+    os.replace(tmp_path, path)
+
+def clean_all_files(lowercase: bool = False, pageids=None) -> list:
+    """Clean every <pageid>.txt in INPUT_DIR (or only the given pageids) into OUTPUT_DIR."""
+    if not os.path.exists(INPUT_DIR):
+        raise FileNotFoundError(f"Input directory not found: {INPUT_DIR}")
+
+    files = sorted(f for f in os.listdir(INPUT_DIR) if f.endswith(".txt"))
+    if pageids is not None:
+        files = [f for f in files if os.path.splitext(f)[0] in pageids]
+    print(f"Found {len(files)} files to clean in {INPUT_DIR}")
+
+    outputs = []
+    for i, filename in enumerate(files, start=1):
+        print(f"[{i}/{len(files)}] Cleaning {filename}")
+        outputs.append(clean_file(
+            os.path.join(INPUT_DIR, filename),
+            os.path.join(OUTPUT_DIR, filename),
+            lowercase=lowercase,
+        ))
+
+    print("\nAll files cleaned successfully.")
+    return outputs
+
 if __name__ == "__main__":
     import argparse
 
-    parser = argparse.ArgumentParser(description="Clean a text file for RAG pipelines.")
-    parser.add_argument("input", help="Path to input .txt file")
-    parser.add_argument("output", help="Path to save cleaned .txt file")
+    parser = argparse.ArgumentParser(description="Clean text files for RAG pipelines.")
+    parser.add_argument("input", nargs="?", help="Path to input .txt file")
+    parser.add_argument("output", nargs="?", help="Path to save cleaned .txt file")
+    parser.add_argument("--all", action="store_true", help=f"Clean every file in {INPUT_DIR}")
+    parser.add_argument("--changed-only", action="store_true", help="With --all, only clean pages changed by the last fetch")
     parser.add_argument("--lowercase", action="store_true", help="Convert text to lowercase")
 
     args = parser.parse_args()
 
-    out = clean_file(args.input, args.output, lowercase=args.lowercase)
-    print(f"Cleaned file saved to: {out}")
\ No newline at end of file
+    if args.changed_only and not args.all:
+        parser.error("--changed-only requires --all")
+
+    if args.all:
+        pageids = load_changed_pageids() if args.changed_only else None
+        clean_all_files(lowercase=args.lowercase, pageids=pageids)
+    elif args.input and args.output:
+        out = clean_file(args.input, args.output, lowercase=args.lowercase)
+        print(f"Cleaned file saved to: {out}")
+    else:
+        parser.error("either input and output paths or --all is required")
\ No newline at end of file
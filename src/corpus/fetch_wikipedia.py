@@ -1,86 +1,248 @@
 import os
-import re
-import unicodedata
-from bs4 import BeautifulSoup
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse, parse_qs
 
-INPUT_DIR = "data/cleaned_text"
-OUTPUT_DIR = "data/cleaned_text_final"
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = "https://en.wikipedia.org/w/api.php"
+URLS_PATH = "data/fixed_urls.json"
+RAW_HTML_DIR = "data/raw_html"
+TEXT_DIR = "data/cleaned_text"
+MANIFEST_PATH = "data/revision_manifest.json"
+CHANGED_PAGES_PATH = "data/changed_pages.json"
+
+BATCH_SIZE = 50          # MediaWiki limit for pageids per query
+MAX_CONCURRENCY = 8
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5     # 0.5s, 1s, 2s, 4s, ...
+TIMEOUT = 30
+
+HEADERS = {
+    "User-Agent": "RAG-Hybrid-Wiki/1.0 (contact: 2024aa05720@wilp.bits-pilani.ac.in)"
+}
+
+
+# -------------------------------
+# Pooled HTTP session with retry/backoff
+# -------------------------------
+def create_session(max_concurrency: int = MAX_CONCURRENCY) -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=max_concurrency,
+        pool_maxsize=max_concurrency,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def api_get(session, api_url: str, params: dict) -> dict:
+    response = session.get(api_url, params={**params, "format": "json", "formatversion": "2"}, timeout=TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    if "error" in data:
+        raise RuntimeError(f"MediaWiki API error: {data['error']}")
+    return data
 
 
 # -------------------------------
-# Cleaning functions
+# Read curids from fixed_urls.json
 # -------------------------------
-def strip_html(text: str) -> str:
-    soup = BeautifulSoup(text, "html.parser")
-    for tag in soup(["script", "style"]):
-        tag.decompose()
-    return soup.get_text(separator=" ")
-
-def normalize_unicode(text: str) -> str:
-    return unicodedata.normalize("NFKC", text)
-
-def collapse_whitespace(text: str) -> str:
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
-
-def remove_boilerplate(text: str) -> str:
-    patterns = [
-        r"©\s*\d{4}.*",
-        r"All rights reserved.*",
-        r"Page \d+ of \d+",
-        r"^\s*Advertisement\s*$",
-    ]
-    for p in patterns:
-        text = re.sub(p, "", text, flags=re.IGNORECASE | re.MULTILINE)
-    return text
-
-def clean_text(text: str, lowercase: bool = False) -> str:
-    text = strip_html(text)
-    text = normalize_unicode(text)
-    text = remove_boilerplate(text)
-    text = collapse_whitespace(text)
-    if lowercase:
-        text = text.lower()
-    return text
+def load_pageids(path: str = URLS_PATH) -> list:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"URL list not found: {path}. Run url_sampling.py first.")
+
+    with open(path, "r", encoding="utf-8") as f:
+        urls = json.load(f)
+
+    pageids = []
+    for url in urls:
+        curid = parse_qs(urlparse(url).query).get("curid")
+        if curid and curid[0] not in pageids:
+            pageids.append(curid[0])
+    return pageids
 
 
 # -------------------------------
-# Clean a single file
+# Resolve latest revision ids (one request per BATCH_SIZE pages)
 # -------------------------------
-def clean_file(input_path: str, output_path: str, lowercase=False):
-    with open(input_path, "r", encoding="utf-8") as f:
-        raw = f.read()
+def fetch_latest_revisions(session, pageids: list, api_url: str = API_URL) -> dict:
+    latest = {}
 
-    cleaned = clean_text(raw, lowercase=lowercase)
+    for start in range(0, len(pageids), BATCH_SIZE):
+        batch = pageids[start : start + BATCH_SIZE]
+        data = api_get(session, api_url, {
+            "action": "query",
+            "prop": "revisions",
+            "rvprop": "ids|timestamp",
+            "pageids": "|".join(batch),
+        })
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(cleaned)
+        for page in data.get("query", {}).get("pages", []):
+            pageid = str(page["pageid"])
+            if page.get("missing") or not page.get("revisions"):
+                print(f"Warning: pageid={pageid} is missing, skipping")
+                continue
 
-    return output_path
+            revision = page["revisions"][0]
+            latest[pageid] = {
+                "title": page.get("title"),
+                "revid": revision["revid"],
+                "timestamp": revision.get("timestamp"),
+            }
+
+    print(f"Resolved {len(latest)}/{len(pageids)} pages to their latest revision")
+    return latest
 
 
 # -------------------------------
-# Clean ALL files in INPUT_DIR
+# Revision manifest (pageid -> last downloaded revision)
 # -------------------------------
-def clean_all_files(lowercase=False):
-    if not os.path.exists(INPUT_DIR):
-        raise FileNotFoundError(f"Input directory not found: {INPUT_DIR}")
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(data, path: str):
+    # Write to a temp file first so an interrupted run never leaves a truncated file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def page_paths(pageid: str):
+    return (
+        os.path.join(RAW_HTML_DIR, f"{pageid}.html"),
+        os.path.join(TEXT_DIR, f"{pageid}.txt"),
+    )
+
+
+def find_changed_pages(latest: dict, manifest: dict, force: bool = False) -> list:
+    changed = []
+    for pageid, info in latest.items():
+        previous = manifest.get(pageid, {})
+        files_present = all(os.path.exists(p) for p in page_paths(pageid))
+        if force or previous.get("revid") != info["revid"] or not files_present:
+            changed.append(pageid)
+    return changed
+
+
+# -------------------------------
+# Download one page revision
+# The plain-text extract and its revid come back in one query, and the
+# HTML is then parsed at exactly that revid, so raw_html, cleaned_text
+# and the manifest always describe the same revision even if the page
+# was edited after fetch_latest_revisions().
+# raw_html     : rendered HTML of that revision
+# cleaned_text : plain-text extract (keeps "== Section ==" headings for the chunker)
+# -------------------------------
+def download_page(session, pageid: str, api_url: str = API_URL) -> dict:
+    extract = api_get(session, api_url, {
+        "action": "query",
+        "prop": "extracts|revisions",
+        "rvprop": "ids|timestamp",
+        "explaintext": 1,
+        "pageids": pageid,
+    })
+    pages = extract.get("query", {}).get("pages", [])
+    if not pages or not pages[0].get("revisions"):
+        raise RuntimeError(f"No revision returned for pageid={pageid}")
+    text = pages[0].get("extract", "")
+    revision = pages[0]["revisions"][0]
+    revid = revision["revid"]
+
+    parsed = api_get(session, api_url, {
+        "action": "parse",
+        "oldid": revid,
+        "prop": "text",
+    })
+    html = parsed["parse"]["text"]
+
+    html_path, text_path = page_paths(pageid)
+    os.makedirs(RAW_HTML_DIR, exist_ok=True)
+    os.makedirs(TEXT_DIR, exist_ok=True)
+
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    with open(text_path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+    return {"revid": revid, "timestamp": revision.get("timestamp")}
+
+
+# -------------------------------
+# Incremental fetch of all pages in fixed_urls.json
+# -------------------------------
+def fetch_all(api_url: str = API_URL, max_concurrency: int = MAX_CONCURRENCY, force: bool = False) -> list:
+    pageids = load_pageids()
+    print(f"Found {len(pageids)} pages in {URLS_PATH}")
+
+    session = create_session(max_concurrency)
+    latest = fetch_latest_revisions(session, pageids, api_url)
+    manifest = load_manifest()
+
+    changed = find_changed_pages(latest, manifest, force=force)
+    print(f"{len(changed)} pages changed since last run, {len(latest) - len(changed)} up to date")
+
+    downloaded = []
+    failed = []
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = {
+            pool.submit(download_page, session, pageid, api_url): pageid
+            for pageid in changed
+        }
+        for i, future in enumerate(as_completed(futures), start=1):
+            pageid = futures[future]
+            try:
+                revision = future.result()
+            except Exception as e:
+                failed.append(pageid)
+                print(f"[{i}/{len(changed)}] Failed pageid={pageid}: {e}")
+                continue
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+            # Only record the revision once its files are on disk,
+            # so a failed page is retried on the next run.
+            manifest[pageid] = {**latest[pageid], **revision}
+            downloaded.append(pageid)
+            print(f"[{i}/{len(changed)}] Downloaded pageid={pageid} revid={revision['revid']}")
 
-    files = [f for f in os.listdir(INPUT_DIR) if f.endswith(".txt")]
-    print(f"Found {len(files)} files in {INPUT_DIR}")
+    session.close()
 
-    for i, filename in enumerate(files, start=1):
-        in_path = os.path.join(INPUT_DIR, filename)
-        out_path = os.path.join(OUTPUT_DIR, filename)
+    # Merge into the pending list instead of replacing it: pages from an
+    # earlier run that were not re-chunked yet must stay marked, because
+    # the manifest already treats them as up to date.
+    pending = set(downloaded)
+    if os.path.exists(CHANGED_PAGES_PATH):
+        with open(CHANGED_PAGES_PATH, "r", encoding="utf-8") as f:
+            pending.update(str(p) for p in json.load(f))
 
-        print(f"[{i}/{len(files)}] Cleaning {filename}")
-        clean_file(in_path, out_path, lowercase=lowercase)
+    save_json(manifest, MANIFEST_PATH)
+    save_json(sorted(pending), CHANGED_PAGES_PATH)
 
-    print("\nAll files cleaned successfully.")
-    return True
+    elapsed = time.perf_counter() - start
+    print(f"\nDownloaded {len(downloaded)} pages in {elapsed:.1f}s ({len(failed)} failed)")
+    print(f"{len(pending)} pages pending for clean/chunk/index stages in {CHANGED_PAGES_PATH}")
+    return downloaded
 
 
 # -------------------------------
@@ -89,8 +251,10 @@ def clean_all_files(lowercase=False):
 if __name__ == "__main__":
     import argparse
 
-    parser = argparse.ArgumentParser(description="Clean all text files in a directory.")
-    parser.add_argument("--lowercase", action="store_true", help="Convert text to lowercase")
+    parser = argparse.ArgumentParser(description="Incrementally fetch Wikipedia pages listed in fixed_urls.json.")
+    parser.add_argument("--api-url", default=API_URL, help="MediaWiki API endpoint (e.g. a local mock server)")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="Max concurrent downloads")
+    parser.add_argument("--force", action="store_true", help="Re-download every page regardless of revision")
     args = parser.parse_args()
 
-    clean_all_files(lowercase=args.lowercase)
\ No newline at end of file
+    fetch_all(api_url=args.api_url, max_concurrency=args.concurrency, force=args.force)
\ No newline at end of file
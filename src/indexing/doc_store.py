@@ -0,0 +1,98 @@
+import os
+import json
+import mmap
+import numpy as np
+
+DOC_STORE_DIR = "data/indexes/doc_store"
+BLOB_FILE = "docs.bin"
+OFFSETS_FILE = "offsets.npy"
+
+
+# ---------------------------------------------------------
+# Build the store
+# docs.bin    : UTF-8 JSON records {chunk_uid, text, metadata}, back to back
+# offsets.npy : uint64[n + 1], record i spans offsets[i]:offsets[i + 1]
+# The record's position in the list is its integer doc id.
+# ---------------------------------------------------------
+def build_doc_store(records, out_dir: str = DOC_STORE_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+
+    offsets = [0]
+    with open(os.path.join(out_dir, BLOB_FILE), "wb") as f:
+        for record in records:
+            blob = json.dumps({
+                "chunk_uid": record["chunk_uid"],
+                "text": record["text"],
+                "metadata": record["metadata"],
+            }).encode("utf-8")
+            f.write(blob)
+            offsets.append(offsets[-1] + len(blob))
+
+    np.save(os.path.join(out_dir, OFFSETS_FILE), np.array(offsets, dtype=np.uint64))
+    print(f"Doc store with {len(offsets) - 1} records saved to {out_dir}")
+
+
+# ---------------------------------------------------------
+# Read-only, memory-mapped access by doc id
+# Only the pages of records actually read are faulted in, so a
+# searcher process does not hold the corpus text in memory.
+# ---------------------------------------------------------
+class DocStore:
+    def __init__(self, path: str = DOC_STORE_DIR):
+        blob_path = os.path.join(path, BLOB_FILE)
+        offsets_path = os.path.join(path, OFFSETS_FILE)
+        if not os.path.exists(blob_path) or not os.path.exists(offsets_path):
+            raise FileNotFoundError(f"Doc store not found in {path}. Run doc_store.py to build it.")
+
+        self.offsets = np.load(offsets_path, mmap_mode="r")
+        self._file = open(blob_path, "rb")
+        # mmap cannot map an empty file
+        if os.path.getsize(blob_path) > 0:
+            self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._blob = b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self, doc_id: int) -> dict:
+        if not 0 <= doc_id < len(self):
+            raise IndexError(f"doc_id {doc_id} out of range (0..{len(self) - 1})")
+        start = int(self.offsets[doc_id])
+        end = int(self.offsets[doc_id + 1])
+        return json.loads(self._blob[start:end].decode("utf-8"))
+
+    def hydrate(self, hits):
+        """Attach chunk_uid/text/metadata to a list of {doc_id, score} hits."""
+        results = []
+        for hit in hits:
+            record = self.get(hit["doc_id"])
+            results.append({
+                "score": hit["score"],
+                "doc_id": hit["doc_id"],
+                "chunk_uid": record["chunk_uid"],
+                "text": record["text"],
+                "metadata": record["metadata"],
+            })
+        return results
+
+    def close(self):
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    from src.corpus.bm25_embed import load_chunks
+
+    _, metadata_list = load_chunks()
+    build_doc_store(metadata_list)
\ No newline at end of file
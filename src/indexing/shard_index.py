@@ -0,0 +1,160 @@
+import os
+import json
+import math
+import zlib
+import numpy as np
+
+from src.corpus.bm25_embed import tokenize, load_chunks
+from src.indexing.doc_store import build_doc_store
+
+EMBED_INPUT = "data/embeddings.jsonl"
+SHARDS_DIR = "data/indexes/shards"
+GLOBAL_STATS_FILE = "global_stats.json"
+SHARD_BM25_FILE = "bm25_shard.json"
+SHARD_DENSE_FILE = "dense_shard.npy"
+SHARD_DOC_STORE = "doc_store"
+
+NUM_SHARDS = 4
+
+# Same defaults as rank_bm25.BM25Okapi so a single shard scores identically
+K1 = 1.5
+B = 0.75
+EPSILON = 0.25
+
+
+# ---------------------------------------------------------
+# Stable shard assignment (Python's hash() is salted per process)
+# ---------------------------------------------------------
+def shard_for_pageid(pageid, num_shards: int) -> int:
+    return zlib.crc32(str(pageid).encode("utf-8")) % num_shards
+
+
+def shard_dir(index: int, shards_dir: str = SHARDS_DIR) -> str:
+    return os.path.join(shards_dir, f"shard_{index}")
+
+
+# ---------------------------------------------------------
+# Corpus-wide BM25 statistics
+# Mirrors BM25Okapi._initialize/_calc_idf so that every shard
+# scores with the IDF and avgdl of the whole corpus.
+# ---------------------------------------------------------
+def compute_global_stats(tokenized_docs):
+    corpus_size = len(tokenized_docs)
+    num_tokens = 0
+    nd = {}
+
+    for doc in tokenized_docs:
+        num_tokens += len(doc)
+        # dict.fromkeys keeps first-seen order so idf_sum accumulates
+        # in the same order as rank_bm25 (bit-identical average_idf)
+        for word in dict.fromkeys(doc):
+            nd[word] = nd.get(word, 0) + 1
+
+    idf = {}
+    idf_sum = 0
+    negative_idfs = []
+    for word, freq in nd.items():
+        value = math.log(corpus_size - freq + 0.5) - math.log(freq + 0.5)
+        idf[word] = value
+        idf_sum += value
+        if value < 0:
+            negative_idfs.append(word)
+
+    average_idf = idf_sum / len(idf) if idf else 0.0
+    eps = EPSILON * average_idf
+    for word in negative_idfs:
+        idf[word] = eps
+
+    return {
+        "corpus_size": corpus_size,
+        "avgdl": num_tokens / corpus_size if corpus_size else 0.0,
+        "k1": K1,
+        "b": B,
+        "idf": idf,
+    }
+
+
+# ---------------------------------------------------------
+# Load dense embeddings produced by embed.py, keyed by chunk_uid
+# ---------------------------------------------------------
+def load_embeddings():
+    if not os.path.exists(EMBED_INPUT):
+        print(f"No embeddings found at {EMBED_INPUT}; building lexical shards only.")
+        return {}
+
+    embeddings = {}
+    with open(EMBED_INPUT, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            embeddings[record["chunk_uid"]] = record["embedding"]
+    return embeddings
+
+
+# ---------------------------------------------------------
+# Build N shards partitioned by pageid hash
+# ---------------------------------------------------------
+def build_shards(num_shards: int = NUM_SHARDS, shards_dir: str = SHARDS_DIR):
+    if num_shards < 1:
+        raise ValueError(f"num_shards must be >= 1, got {num_shards}")
+
+    documents, metadata_list = load_chunks()
+    tokenized_docs = [tokenize(doc) for doc in documents]
+    embeddings = load_embeddings()
+    dim = len(next(iter(embeddings.values()))) if embeddings else 0
+
+    # doc_id is the position in the globally sorted chunk list, which is
+    # also the order search_bm25() breaks score ties in.
+    # Shards hold only ids and tokens; text/metadata live in one doc store.
+    shards = [{"doc_ids": [], "tokenized_docs": []} for _ in range(num_shards)]
+    shard_uids = [[] for _ in range(num_shards)]
+    for doc_id, (tokens, meta) in enumerate(zip(tokenized_docs, metadata_list)):
+        pageid = meta["metadata"].get("pageid", meta["chunk_uid"].split("_chunk_")[0])
+        i = shard_for_pageid(pageid, num_shards)
+        shards[i]["doc_ids"].append(doc_id)
+        shards[i]["tokenized_docs"].append(tokens)
+        shard_uids[i].append(meta["chunk_uid"])
+
+    os.makedirs(shards_dir, exist_ok=True)
+
+    for i, shard in enumerate(shards):
+        out_dir = shard_dir(i, shards_dir)
+        os.makedirs(out_dir, exist_ok=True)
+
+        with open(os.path.join(out_dir, SHARD_BM25_FILE), "w", encoding="utf-8") as f:
+            json.dump(shard, f)
+
+        dense_path = os.path.join(out_dir, SHARD_DENSE_FILE)
+        if embeddings:
+            # reshape keeps an empty shard 2-D as (0, dim) instead of (0,)
+            vectors = np.array(
+                [embeddings[uid] for uid in shard_uids[i]],
+                dtype=np.float32,
+            ).reshape(-1, dim)
+            np.save(dense_path, vectors)
+        elif os.path.exists(dense_path):
+            os.remove(dense_path)
+
+        print(f"Shard {i}: {len(shard['doc_ids'])} chunks -> {out_dir}")
+
+    build_doc_store(metadata_list, os.path.join(shards_dir, SHARD_DOC_STORE))
+
+    stats = compute_global_stats(tokenized_docs)
+    stats["num_shards"] = num_shards
+    with open(os.path.join(shards_dir, GLOBAL_STATS_FILE), "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+
+    print(f"Built {num_shards} shards in {shards_dir}")
+
+
+# ---------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Partition the chunk corpus into N index shards.")
+    parser.add_argument("--num-shards", type=int, default=NUM_SHARDS, help="Number of shards")
+    parser.add_argument("--out", default=SHARDS_DIR, help="Output directory for shards")
+    args = parser.parse_args()
+
+    build_shards(num_shards=args.num_shards, shards_dir=args.out)
\ No newline at end of file
@@ -0,0 +1,179 @@
+import os
+import json
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from src.corpus.bm25_embed import tokenize
+from src.indexing.doc_store import DocStore
+from src.indexing.shard_index import (
+    SHARDS_DIR,
+    GLOBAL_STATS_FILE,
+    SHARD_BM25_FILE,
+    SHARD_DENSE_FILE,
+    SHARD_DOC_STORE,
+    shard_dir,
+)
+
+
+# ---------------------------------------------------------
+# Shard worker (runs inside its own process)
+# Each worker process owns exactly one shard, loaded once by the
+# pool initializer, so shard data is never pickled per query.
+# ---------------------------------------------------------
+_SHARD = None
+
+
+def _init_shard_worker(path: str):
+    global _SHARD
+
+    with open(os.path.join(path, SHARD_BM25_FILE), "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    doc_freqs = []
+    for doc in data["tokenized_docs"]:
+        frequencies = {}
+        for word in doc:
+            frequencies[word] = frequencies.get(word, 0) + 1
+        doc_freqs.append(frequencies)
+
+    dense_path = os.path.join(path, SHARD_DENSE_FILE)
+    dense = None
+    if os.path.exists(dense_path):
+        dense = np.load(dense_path)
+        norms = np.linalg.norm(dense, axis=1, keepdims=True)
+        dense = dense / np.where(norms == 0, 1, norms)
+
+    _SHARD = {
+        "doc_ids": data["doc_ids"],
+        "doc_freqs": doc_freqs,
+        "doc_len": np.array([len(doc) for doc in data["tokenized_docs"]]),
+        "dense": dense,
+    }
+
+
+def _local_top_k(scores, top_k: int):
+    # Ties are broken by global doc_id so merged results are deterministic
+    # and identical regardless of how chunks were partitioned.
+    doc_ids = _SHARD["doc_ids"]
+    best = heapq.nlargest(
+        top_k,
+        range(len(doc_ids)),
+        key=lambda i: (scores[i], -doc_ids[i]),
+    )
+
+    return [{"doc_id": doc_ids[i], "score": float(scores[i])} for i in best]
+
+
+def _shard_bm25_top_k(query_tokens, idf, avgdl, k1, b, top_k):
+    """Score this shard with corpus-wide IDF/avgdl (same formula as BM25Okapi.get_scores)."""
+    doc_len = _SHARD["doc_len"]
+    scores = np.zeros(len(doc_len))
+    for q in query_tokens:
+        q_freq = np.array([(doc.get(q) or 0) for doc in _SHARD["doc_freqs"]])
+        scores += (idf.get(q) or 0) * (
+            q_freq * (k1 + 1) / (q_freq + k1 * (1 - b + b * doc_len / avgdl))
+        )
+    return _local_top_k(scores, top_k)
+
+
+def _shard_dense_top_k(query_vector, top_k):
+    if _SHARD["dense"] is None or len(_SHARD["dense"]) == 0:
+        return []
+    scores = _SHARD["dense"] @ query_vector
+    return _local_top_k(scores, top_k)
+
+
+# ---------------------------------------------------------
+# Search coordinator: scatter a query to every shard, gather
+# the local top-k lists and merge them into a global top-k.
+# Workers return only ids and scores; text is read from the
+# doc store for the final top-k.
+# ---------------------------------------------------------
+class ShardedSearcher:
+    def __init__(self, shards_dir: str = SHARDS_DIR):
+        stats_path = os.path.join(shards_dir, GLOBAL_STATS_FILE)
+        if not os.path.exists(stats_path):
+            raise FileNotFoundError(
+                f"Shard index not found in {shards_dir}. Run shard_index.py to build it."
+            )
+
+        with open(stats_path, "r", encoding="utf-8") as f:
+            self.stats = json.load(f)
+
+        self.num_shards = self.stats["num_shards"]
+        self.store = DocStore(os.path.join(shards_dir, SHARD_DOC_STORE))
+        self.executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_shard_worker,
+                initargs=(shard_dir(i, shards_dir),),
+            )
+            for i in range(self.num_shards)
+        ]
+        self.model = None
+
+    def _gather(self, fn, *args, top_k: int):
+        futures = [ex.submit(fn, *args, top_k) for ex in self.executors]
+        candidates = [r for fut in futures for r in fut.result()]
+        hits = heapq.nlargest(
+            top_k,
+            candidates,
+            key=lambda r: (r["score"], -r["doc_id"]),
+        )
+        return self.store.hydrate(hits)
+
+    def search_bm25(self, query: str, top_k: int = 5):
+        query_tokens = tokenize(query)
+        # Only the IDF entries for the query terms travel to the workers
+        idf = {q: self.stats["idf"][q] for q in query_tokens if q in self.stats["idf"]}
+        return self._gather(
+            _shard_bm25_top_k,
+            query_tokens,
+            idf,
+            self.stats["avgdl"],
+            self.stats["k1"],
+            self.stats["b"],
+            top_k=top_k,
+        )
+
+    def search_dense(self, query: str, top_k: int = 5):
+        if self.model is None:
+            from src.corpus.embed import load_model
+            self.model = load_model()
+
+        query_vector = np.asarray(self.model.encode(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm:
+            query_vector = query_vector / norm
+        return self._gather(_shard_dense_top_k, query_vector, top_k=top_k)
+
+    def close(self):
+        for ex in self.executors:
+            ex.shutdown()
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the sharded BM25/dense index.")
+    parser.add_argument("query", help="Query text")
+    parser.add_argument("--top-k", type=int, default=5, help="Number of results")
+    parser.add_argument("--dense", action="store_true", help="Use dense instead of BM25 retrieval")
+    parser.add_argument("--shards", default=SHARDS_DIR, help="Shard index directory")
+    args = parser.parse_args()
+
+    with ShardedSearcher(args.shards) as searcher:
+        search = searcher.search_dense if args.dense else searcher.search_bm25
+        for r in search(args.query, top_k=args.top_k):
+            print(f"{r['score']:.4f}  {r['chunk_uid']}  {r['text'][:80]}")
\ No newline at end of file
@@ -0,0 +1,200 @@
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+from src.corpus.chunker import split_into_sentences
+
+TOKEN_BUDGET = 1500
+SPAN_SEPARATOR = "\n\n"
+
+
+# ---------------------------------------------------------
+# Approximate token counter (words + punctuation)
+# Pass a real tokenizer's counter to assemble_context() for
+# exact numbers against a specific LLM.
+# ---------------------------------------------------------
+def count_tokens(text: str) -> int:
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+# ---------------------------------------------------------
+# Map a retrieved chunk back to {sentence_index: sentence}
+# chunker.create_chunks() joins a window with " ", so splitting
+# again yields the same sentences starting at start_sentence.
+# ---------------------------------------------------------
+def chunk_sentences(result):
+    start = result["metadata"].get("start_sentence", 0)
+    return {start + i: s for i, s in enumerate(split_into_sentences(result["text"]))}
+
+
+# ---------------------------------------------------------
+# Merge overlapping/adjacent sentence windows per page
+# ---------------------------------------------------------
+def merge_spans(results):
+    pages = {}
+    for result in results:
+        meta = result["metadata"]
+        # Chunks without sentence positions cannot be merged; keep them as-is
+        if "pageid" not in meta or "start_sentence" not in meta:
+            key = result["chunk_uid"]
+        else:
+            key = str(meta["pageid"])
+        pages.setdefault(key, []).append(result)
+
+    spans = []
+    for key, chunks in pages.items():
+        sentences = {}
+        ranges = []
+        for chunk in chunks:
+            chunk_sents = chunk_sentences(chunk)
+            if not chunk_sents:
+                continue
+            sentences.update(chunk_sents)
+            ranges.append((min(chunk_sents), max(chunk_sents), chunk))
+
+        page_spans = []
+        for start, end, chunk in sorted(ranges, key=lambda r: (r[0], r[1])):
+            current = page_spans[-1] if page_spans else None
+            if current is not None and start <= current["end_sentence"] + 1:
+                current["end_sentence"] = max(current["end_sentence"], end)
+                current["score"] = max(current["score"], chunk["score"])
+                current["chunk_uids"].append(chunk["chunk_uid"])
+                continue
+
+            page_spans.append({
+                "pageid": key,
+                "title": chunk["metadata"].get("title"),
+                "start_sentence": start,
+                "end_sentence": end,
+                "score": chunk["score"],
+                "chunk_uids": [chunk["chunk_uid"]],
+            })
+
+        for span in page_spans:
+            span["sentences"] = [
+                sentences[i]
+                for i in range(span["start_sentence"], span["end_sentence"] + 1)
+                if i in sentences
+            ]
+        spans.extend(page_spans)
+
+    return spans
+
+
+# ---------------------------------------------------------
+# Format a span as a prompt block
+# ---------------------------------------------------------
+def span_block(title, sentences):
+    text = " ".join(sentences)
+    return f"[{title}]\n{text}" if title else text
+
+
+# ---------------------------------------------------------
+# Longest sentence prefix of a span that fits in `remaining` tokens
+# The title and each sentence are counted once and the cut point is
+# found on the cumulative sums, so truncation costs O(n) counter calls
+# instead of re-tokenizing the block for every dropped sentence.
+# ---------------------------------------------------------
+def fit_sentences(span, remaining: int, token_counter=count_tokens):
+    header = token_counter(span_block(span["title"], [])) if span["title"] else 0
+    cumulative = list(accumulate(token_counter(s) for s in span["sentences"]))
+    n = bisect_right(cumulative, remaining - header)
+
+    # A real tokenizer may count the joined block slightly differently
+    # from the sum of its parts; back off until the block really fits.
+    while n and token_counter(span_block(span["title"], span["sentences"][:n])) > remaining:
+        n -= 1
+    return span["sentences"][:n]
+
+
+# ---------------------------------------------------------
+# Build a prompt context that fits in token_budget
+# Spans are packed greedily by score. A span that does not fit in
+# the remaining budget is cut at a sentence boundary, so a large
+# merged top-scored span is shortened rather than dropped.
+# ---------------------------------------------------------
+def assemble_context(results, token_budget: int = TOKEN_BUDGET, token_counter=count_tokens):
+    if not results:
+        return {
+            "context": "",
+            "spans": [],
+            "context_tokens": 0,
+            "naive_tokens": 0,
+            "merged_tokens": 0,
+            "tokens_saved": 0,
+            "dropped_spans": 0,
+        }
+
+    naive_text = SPAN_SEPARATOR.join(r["text"] for r in results)
+
+    spans = merge_spans(results)
+    spans.sort(key=lambda s: (-s["score"], s["pageid"], s["start_sentence"]))
+
+    # The same sentence can also appear under two pageids (templates,
+    # boilerplate); keep only its first, highest-scored occurrence.
+    seen = set()
+    for span in spans:
+        span["sentences"] = [s for s in span["sentences"] if s not in seen]
+        seen.update(span["sentences"])
+        span["text"] = " ".join(span["sentences"])
+    spans = [s for s in spans if s["text"]]
+
+    merged_text = SPAN_SEPARATOR.join(s["text"] for s in spans)
+
+    separator_tokens = token_counter(SPAN_SEPARATOR)
+    packed = []
+    used = 0
+    for span in spans:
+        separator = separator_tokens if packed else 0
+        sentences = span["sentences"]
+        block = span_block(span["title"], sentences)
+        cost = token_counter(block) + separator
+
+        if used + cost > token_budget:
+            sentences = fit_sentences(span, token_budget - used - separator, token_counter)
+            if not sentences:
+                continue
+            block = span_block(span["title"], sentences)
+            cost = token_counter(block) + separator
+
+        span["truncated"] = len(sentences) < len(span["sentences"])
+        span["text"] = " ".join(sentences)
+        span["tokens"] = cost
+        packed.append((span, block))
+        used += cost
+
+    naive_tokens = token_counter(naive_text)
+    merged_tokens = token_counter(merged_text)
+
+    return {
+        "context": SPAN_SEPARATOR.join(block for _, block in packed),
+        "spans": [span for span, _ in packed],
+        "context_tokens": used,
+        "naive_tokens": naive_tokens,
+        "merged_tokens": merged_tokens,
+        "tokens_saved": naive_tokens - merged_tokens,
+        "dropped_spans": len(spans) - len(packed),
+    }
+
+
+# ---------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+    from src.corpus.bm25_embed import search_bm25
+
+    parser = argparse.ArgumentParser(description="Assemble an LLM context from BM25 results.")
+    parser.add_argument("query", help="Query text")
+    parser.add_argument("--top-k", type=int, default=10, help="Number of chunks to retrieve")
+    parser.add_argument("--budget", type=int, default=TOKEN_BUDGET, help="Token budget for the context")
+    args = parser.parse_args()
+
+    assembled = assemble_context(search_bm25(args.query, top_k=args.top_k), token_budget=args.budget)
+
+    print(assembled["context"])
+    print(
+        f"\nspans={len(assembled['spans'])} dropped={assembled['dropped_spans']} "
+        f"context_tokens={assembled['context_tokens']} naive_tokens={assembled['naive_tokens']} "
+        f"merged_tokens={assembled['merged_tokens']} saved={assembled['tokens_saved']}"
+    )
\ No newline at end of file
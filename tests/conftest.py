@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules import each other as src.*, the same as `python -m` from the repo root
+sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture
+def repo_cwd(monkeypatch):
+    # Pipeline modules use data/... paths relative to the repo root
+    monkeypatch.chdir(REPO_ROOT)
+    return REPO_ROOT
@@ -0,0 +1,131 @@
+import json
+import os
+
+from src.corpus.chunker import split_into_sentences
+from src.rag.context import assemble_context, count_tokens, merge_spans
+
+
+def load_chunk(chunk_uid, score):
+    with open(os.path.join("data", "chunks", f"{chunk_uid}.txt"), encoding="utf-8") as f:
+        text = f.read().strip()
+    with open(os.path.join("data", "chunks", f"{chunk_uid}.json"), encoding="utf-8") as f:
+        metadata = json.load(f)
+    return {"score": score, "chunk_uid": chunk_uid, "text": text, "metadata": metadata}
+
+
+def make_chunk(pageid, start, sentences, score, title="Page"):
+    return {
+        "score": score,
+        "chunk_uid": f"{pageid}_chunk_{start}",
+        "text": " ".join(sentences),
+        "metadata": {
+            "pageid": pageid,
+            "title": title,
+            "start_sentence": start,
+            "end_sentence": start + len(sentences) - 1,
+        },
+    }
+
+
+def sentences(pageid, start, end):
+    return [f"Page {pageid} sentence {i}." for i in range(start, end + 1)]
+
+
+def test_overlapping_chunks_merge_into_page_sentences(repo_cwd):
+    results = [load_chunk("752_chunk_1", 2.0), load_chunk("752_chunk_0", 1.0)]
+
+    spans = merge_spans(results)
+
+    with open(os.path.join("data", "cleaned_text_final", "752.txt"), encoding="utf-8") as f:
+        page = split_into_sentences(f.read())
+    assert len(spans) == 1
+    assert (spans[0]["start_sentence"], spans[0]["end_sentence"]) == (0, 13)
+    assert spans[0]["sentences"] == page[0:14]
+    assert spans[0]["score"] == 2.0
+    assert sorted(spans[0]["chunk_uids"]) == ["752_chunk_0", "752_chunk_1"]
+
+
+def test_adjacent_windows_merge_and_gaps_do_not():
+    results = [
+        make_chunk("1", 0, sentences("1", 0, 3), 1.0),
+        make_chunk("1", 4, sentences("1", 4, 7), 0.5),     # adjacent to 0-3
+        make_chunk("1", 10, sentences("1", 10, 12), 0.8),  # gap at 8-9
+    ]
+
+    spans = sorted(merge_spans(results), key=lambda s: s["start_sentence"])
+
+    assert [(s["start_sentence"], s["end_sentence"]) for s in spans] == [(0, 7), (10, 12)]
+    assert spans[0]["sentences"] == sentences("1", 0, 7)
+
+
+def test_sentence_duplicated_across_pages_is_kept_once():
+    shared = "This sentence is on both pages."
+    results = [
+        make_chunk("1", 0, ["Only on page one.", shared], 2.0),
+        make_chunk("2", 0, [shared, "Only on page two."], 1.0),
+    ]
+
+    assembled = assemble_context(results, token_budget=1000)
+
+    assert assembled["context"].count(shared) == 1
+    assert [s["sentences"] for s in assembled["spans"]] == [
+        ["Only on page one.", shared],
+        ["Only on page two."],
+    ]
+
+
+def test_merging_saves_tokens(repo_cwd):
+    results = [load_chunk("752_chunk_0", 1.0), load_chunk("752_chunk_1", 0.9)]
+
+    assembled = assemble_context(results, token_budget=10000)
+
+    assert assembled["tokens_saved"] > 0
+    assert assembled["naive_tokens"] - assembled["merged_tokens"] == assembled["tokens_saved"]
+
+
+def test_budget_packs_by_score_and_truncates_top_span():
+    results = [
+        make_chunk("1", 0, sentences("1", 0, 9), 3.0, title="Top"),
+        make_chunk("2", 0, sentences("2", 0, 1), 1.0, title="Low"),
+    ]
+    top_two = count_tokens("[Top]\n" + " ".join(sentences("1", 0, 1)))
+
+    assembled = assemble_context(results, token_budget=top_two)
+
+    # The top span is cut to its first two sentences rather than dropped
+    assert [s["title"] for s in assembled["spans"]] == ["Top"]
+    assert assembled["spans"][0]["truncated"]
+    assert assembled["context"] == "[Top]\n" + " ".join(sentences("1", 0, 1))
+    assert assembled["context_tokens"] <= top_two
+    assert assembled["dropped_spans"] == 1
+
+
+def test_budget_fits_everything():
+    results = [
+        make_chunk("1", 0, sentences("1", 0, 2), 3.0, title="Top"),
+        make_chunk("2", 0, sentences("2", 0, 2), 1.0, title="Low"),
+    ]
+
+    assembled = assemble_context(results, token_budget=1000)
+
+    assert [s["title"] for s in assembled["spans"]] == ["Top", "Low"]
+    assert not any(s["truncated"] for s in assembled["spans"])
+    assert assembled["context_tokens"] == count_tokens(assembled["context"])
+    assert assembled["dropped_spans"] == 0
+
+
+def test_truncation_counts_each_sentence_once():
+    results = [make_chunk("1", 0, sentences("1", 0, 199), 1.0, title="Long")]
+    calls = []
+
+    def counting_counter(text):
+        calls.append(text)
+        return count_tokens(text)
+
+    budget = count_tokens("[Long]\n" + " ".join(sentences("1", 0, 49)))
+    assembled = assemble_context(results, token_budget=budget, token_counter=counting_counter)
+
+    assert assembled["spans"][0]["sentences"][:50] == sentences("1", 0, 49)
+    assert assembled["context"] == "[Long]\n" + " ".join(sentences("1", 0, 49))
+    # naive + merged + separator + full block + header + 200 sentences + fit check + final block
+    assert len(calls) <= 200 + 10
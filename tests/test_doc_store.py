@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+from src.corpus.bm25_embed import load_chunks, retrieve_bm25, search_bm25
+from src.indexing.doc_store import DocStore, build_doc_store
+
+
+def test_doc_store_round_trips_every_chunk(repo_cwd, tmp_path):
+    _, metadata_list = load_chunks()
+    build_doc_store(metadata_list, str(tmp_path))
+
+    with DocStore(str(tmp_path)) as store:
+        assert len(store) == len(metadata_list)
+        for doc_id, record in enumerate(metadata_list):
+            assert store.get(doc_id) == record
+
+        with pytest.raises(IndexError):
+            store.get(len(metadata_list))
+        with pytest.raises(IndexError):
+            store.get(-1)
+
+
+def test_empty_doc_store(tmp_path):
+    build_doc_store([], str(tmp_path))
+
+    with DocStore(str(tmp_path)) as store:
+        assert len(store) == 0
+        assert store.hydrate([]) == []
+        with pytest.raises(IndexError):
+            store.get(0)
+
+
+def test_missing_doc_store_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DocStore(str(tmp_path))
+
+
+def test_retrieve_bm25_returns_only_ids_and_scores(repo_cwd):
+    hits = retrieve_bm25("history of modern art", top_k=5)
+
+    assert len(hits) == 5
+    for hit in hits:
+        assert set(hit) == {"doc_id", "score"}
+        assert isinstance(hit["doc_id"], int)
+        assert isinstance(hit["score"], float)
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+
+
+def test_search_bm25_text_and_metadata_match_chunk_files(repo_cwd):
+    results = search_bm25("quantum mechanics and the atom", top_k=10)
+
+    assert len(results) == 10
+    for result in results:
+        base = os.path.join("data", "chunks", result["chunk_uid"])
+        with open(f"{base}.txt", "r", encoding="utf-8") as f:
+            assert result["text"] == f.read().strip()
+        with open(f"{base}.json", "r", encoding="utf-8") as f:
+            assert result["metadata"] == json.load(f)
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from src.corpus import fetch_wikipedia as fw
+
+
+# ---------------------------------------------------------
+# Minimal MediaWiki API mock
+# ---------------------------------------------------------
+class MockWiki:
+    def __init__(self, revs):
+        self.revs = dict(revs)
+        self.calls = []
+        self.fail_503 = 0          # next N requests answer 503
+        self.broken = set()        # pageids whose parse always 404s
+        self.lock = threading.Lock()
+
+    def respond(self, params):
+        with self.lock:
+            self.calls.append(params)
+            if self.fail_503:
+                self.fail_503 -= 1
+                return 503, None
+
+        if params.get("action") == "parse":
+            revid = int(params["oldid"])
+            pageid = next(p for p, r in self.revs.items() if r == revid)
+            if pageid in self.broken:
+                return 404, None
+            return 200, {"parse": {"text": f"<p>{pageid} rev {revid}</p>"}}
+
+        if params.get("prop") == "revisions":
+            pages = []
+            for p in params["pageids"].split("|"):
+                if p in self.revs:
+                    pages.append({"pageid": int(p), "title": f"T{p}", "revisions": [{"revid": self.revs[p], "timestamp": f"ts-{self.revs[p]}"}]})
+                else:
+                    pages.append({"pageid": int(p), "missing": True})
+            return 200, {"query": {"pages": pages}}
+
+        p = params["pageids"]
+        return 200, {"query": {"pages": [{
+            "pageid": int(p),
+            "extract": f"== Intro ==\n{p} rev {self.revs[p]}.",
+            "revisions": [{"revid": self.revs[p], "timestamp": f"ts-{self.revs[p]}"}],
+        }]}}
+
+    def revision_calls(self):
+        return [c for c in self.calls if c.get("prop") == "revisions"]
+
+    def download_calls(self):
+        return [c for c in self.calls if c.get("action") == "parse"]
+
+
+@pytest.fixture
+def wiki(tmp_path, monkeypatch):
+    mock = MockWiki({"1": 100, "2": 200, "3": 300})
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            status, body = mock.respond(params)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            if body is not None:
+                self.wfile.write(json.dumps(body).encode("utf-8"))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fw, "BACKOFF_FACTOR", 0)
+    (tmp_path / "data").mkdir()
+    with open(tmp_path / "data" / "fixed_urls.json", "w", encoding="utf-8") as f:
+        json.dump([f"https://en.wikipedia.org/?curid={p}" for p in ("1", "2", "3")], f)
+
+    mock.url = f"http://127.0.0.1:{server.server_port}/w/api.php"
+    yield mock
+    server.shutdown()
+    server.server_close()
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_first_run_downloads_all_pages(wiki):
+    assert sorted(fw.fetch_all(api_url=wiki.url)) == ["1", "2", "3"]
+
+    manifest = read_json(fw.MANIFEST_PATH)
+    assert {p: m["revid"] for p, m in manifest.items()} == {"1": 100, "2": 200, "3": 300}
+    assert read_json(fw.CHANGED_PAGES_PATH) == ["1", "2", "3"]
+    with open("data/cleaned_text/2.txt", encoding="utf-8") as f:
+        assert f.read() == "== Intro ==\n2 rev 200."
+    with open("data/raw_html/2.html", encoding="utf-8") as f:
+        assert f.read() == "<p>2 rev 200</p>"
+
+
+def test_second_run_only_checks_revisions(wiki):
+    fw.fetch_all(api_url=wiki.url)
+    wiki.calls.clear()
+
+    assert fw.fetch_all(api_url=wiki.url) == []
+    assert len(wiki.revision_calls()) == 1
+    assert wiki.download_calls() == []
+
+
+def test_only_bumped_page_is_downloaded(wiki):
+    fw.fetch_all(api_url=wiki.url)
+    wiki.calls.clear()
+    wiki.revs["2"] = 201
+
+    assert fw.fetch_all(api_url=wiki.url) == ["2"]
+    assert [c["oldid"] for c in wiki.download_calls()] == ["201"]
+    assert read_json(fw.MANIFEST_PATH)["2"]["revid"] == 201
+
+
+def test_retry_recovers_from_503(wiki):
+    wiki.fail_503 = 1
+
+    assert sorted(fw.fetch_all(api_url=wiki.url)) == ["1", "2", "3"]
+    assert len(wiki.revision_calls()) == 2
+
+
+def test_failed_download_stays_out_of_manifest(wiki):
+    wiki.broken.add("3")
+
+    assert sorted(fw.fetch_all(api_url=wiki.url)) == ["1", "2"]
+    assert "3" not in read_json(fw.MANIFEST_PATH)
+    assert "3" not in read_json(fw.CHANGED_PAGES_PATH)
+
+    # Retried on the next run once the page is reachable again
+    wiki.broken.clear()
+    assert fw.fetch_all(api_url=wiki.url) == ["3"]
+
+
+def test_pending_pages_survive_repeated_fetches(wiki):
+    fw.fetch_all(api_url=wiki.url)
+    wiki.revs["1"] = 101
+    fw.fetch_all(api_url=wiki.url)
+    fw.fetch_all(api_url=wiki.url)
+
+    # Nothing downstream has consumed the list yet, so nothing is lost
+    assert read_json(fw.CHANGED_PAGES_PATH) == ["1", "2", "3"]
+
+
+def test_text_html_and_manifest_share_one_revision(wiki, monkeypatch):
+    # Page 2 is edited between resolving revisions and downloading it
+    resolve = fw.fetch_latest_revisions
+
+    def resolve_then_edit(*args, **kwargs):
+        latest = resolve(*args, **kwargs)
+        wiki.revs["2"] = 202
+        return latest
+
+    monkeypatch.setattr(fw, "fetch_latest_revisions", resolve_then_edit)
+    fw.fetch_all(api_url=wiki.url)
+
+    assert read_json(fw.MANIFEST_PATH)["2"]["revid"] == 202
+    assert read_json(fw.MANIFEST_PATH)["2"]["timestamp"] == "ts-202"
+    with open("data/cleaned_text/2.txt", encoding="utf-8") as f:
+        assert f.read().endswith("2 rev 202.")
+    with open("data/raw_html/2.html", encoding="utf-8") as f:
+        assert f.read() == "<p>2 rev 202</p>"
+
+
+def write_cleaned(pageid):
+    os.makedirs("data/cleaned_text_final", exist_ok=True)
+    with open(f"data/cleaned_text_final/{pageid}.txt", "w", encoding="utf-8") as f:
+        f.write(f"Page {pageid} one. Page {pageid} two. Page {pageid} three. Page {pageid} four.")
+
+
+def test_changed_only_chunking_clears_only_chunked_pages(wiki, monkeypatch):
+    from src.corpus import chunker
+    from src.corpus.clean_text import load_changed_pageids
+
+    monkeypatch.setattr(chunker, "load_title", lambda pageid: f"T{pageid}")
+    fw.fetch_all(api_url=wiki.url)
+
+    # 1: cleaned after fetch; 2: never cleaned; 3: cleaned file older than the fetched text
+    write_cleaned("1")
+    write_cleaned("3")
+    fetched_mtime = os.path.getmtime("data/cleaned_text/3.txt")
+    os.utime("data/cleaned_text_final/3.txt", (fetched_mtime - 60, fetched_mtime - 60))
+
+    assert chunker.chunk_changed_files() == ["1"]
+    assert os.path.exists("data/chunks/1_chunk_0.txt")
+    assert not os.path.exists("data/chunks/3_chunk_0.txt")
+    assert load_changed_pageids() == {"2", "3"}
+
+    write_cleaned("3")
+    assert chunker.chunk_changed_files() == ["3"]
+    assert load_changed_pageids() == {"2"}
@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.corpus.bm25_embed import search_bm25
+from src.indexing import shard_index
+from src.indexing.shard_index import build_shards, shard_dir, SHARD_DENSE_FILE
+from src.indexing.shard_search import ShardedSearcher
+
+QUERIES = [
+    "history of modern art",
+    "quantum mechanics and the atom",
+    "economic growth and inflation",
+    "the a of",
+]
+
+
+@pytest.mark.parametrize("num_shards", [1, 2, 4])
+def test_sharded_results_match_single_index(repo_cwd, tmp_path, num_shards):
+    out = str(tmp_path / f"shards_{num_shards}")
+    build_shards(num_shards=num_shards, shards_dir=out)
+
+    with ShardedSearcher(out) as searcher:
+        for query in QUERIES:
+            expected = search_bm25(query, top_k=10)
+            actual = searcher.search_bm25(query, top_k=10)
+            assert [(r["chunk_uid"], r["score"]) for r in actual] == \
+                [(r["chunk_uid"], r["score"]) for r in expected]
+            assert [r["text"] for r in actual] == [r["text"] for r in expected]
+
+
+class _FakeModel:
+    def __init__(self, vector):
+        self.vector = vector
+
+    def encode(self, query):
+        return self.vector
+
+
+@pytest.fixture
+def fake_embeddings(repo_cwd, tmp_path, monkeypatch):
+    from src.corpus.bm25_embed import load_chunks
+
+    _, metadata_list = load_chunks()
+    rng = np.random.default_rng(0)
+    embed_path = tmp_path / "embeddings.jsonl"
+    with open(embed_path, "w", encoding="utf-8") as f:
+        for meta in metadata_list:
+            f.write(json.dumps({"chunk_uid": meta["chunk_uid"], "embedding": rng.random(8).tolist()}) + "\n")
+    monkeypatch.setattr(shard_index, "EMBED_INPUT", str(embed_path))
+    return rng
+
+
+def test_sharded_dense_results_match_single_shard(fake_embeddings, tmp_path):
+    query_vectors = [fake_embeddings.random(8).astype(np.float32) for _ in range(3)]
+
+    results = {}
+    for num_shards in (1, 2, 4):
+        out = str(tmp_path / f"dense_{num_shards}")
+        build_shards(num_shards=num_shards, shards_dir=out)
+        with ShardedSearcher(out) as searcher:
+            results[num_shards] = []
+            for vector in query_vectors:
+                searcher.model = _FakeModel(vector)
+                hits = searcher.search_dense("anything", top_k=10)
+                results[num_shards].append([(r["chunk_uid"], r["score"]) for r in hits])
+
+    assert all(len(hits) == 10 for hits in results[1])
+    assert results[2] == results[1]
+    assert results[4] == results[1]
+
+
+def test_empty_shards_with_embeddings(fake_embeddings, tmp_path):
+    # 26 pages over 64 shards leaves most shards empty
+    out = str(tmp_path / "shards_64")
+    build_shards(num_shards=64, shards_dir=out)
+    empty = [i for i in range(64) if np.load(f"{shard_dir(i, out)}/{SHARD_DENSE_FILE}").shape == (0, 8)]
+    assert empty
+
+    with ShardedSearcher(out) as searcher:
+        assert len(searcher.search_bm25("history of modern art", top_k=5)) == 5
+
+        searcher.model = _FakeModel(fake_embeddings.random(8).astype(np.float32))
+        assert len(searcher.search_dense("anything", top_k=5)) == 5